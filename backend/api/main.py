@@ -2,46 +2,100 @@
 FastAPI application entry point.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import BackgroundTasks, FastAPI, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
+import anyio.to_thread
+import asyncio
 import logging
 
 from backend.api.routes import (
     process_products,
+    get_process_status,
     health_check,
+    check_comparison_projection,
     get_product_comparison_route,
+    get_product_comparisons_route,
+    stream_product_comparisons_route,
 )
 from backend.api.schemas import (
-    ProcessResponse,
+    ProcessJobResponse,
+    ProcessJobStatusResponse,
     HealthResponse,
     ProductComparisonSchema,
 )
-from backend.core.logging import setup_logging
+from backend.core.logging import setup_logging, stop_logging
 from backend.core.config import get_settings
+from backend.database.mongo_service import close_mongo_service
+from backend.services.product_comparison_service import get_comparison_service
 
 # Setup logging
 settings = get_settings()
 setup_logging(settings.log_level)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Run on application startup, then on shutdown after the yield
+    logger.info("Product Extractor API starting up...")
+    logger.info(f"Environment: {settings.app_env}")
+    logger.info(f"Debug mode: {settings.debug}")
+
+    # Size the threadpool Starlette runs sync handlers and sync streaming iterators in
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    # Comparison routes return plain dicts, check their shape against the schema once here
+    check_comparison_projection()
+
+    # Build the OpenAPI schema now rather than on the first /docs or /openapi.json request
+    if settings.enable_docs:
+        app.openapi()
+
+    # Warm up the comparison service (MongoDB client, indexes and date migration) so the first
+    # comparison request does not pay the initialization cost. The API still starts if this
+    # fails; comparison requests return 500 and retry the initialization until it succeeds
+    try:
+        await asyncio.to_thread(get_comparison_service)
+    except Exception as e:
+        logger.warning(f"Comparison service warmup failed, comparisons unavailable until it succeeds: {e}")
+
+    yield
+
+    logger.info("Product Extractor API shutting down...")
+    close_mongo_service()
+    stop_logging()
+
+
+# Pre-serialized HealthResponse body for the /health probe
+_HEALTH_BYTES = b'{"status":"healthy","version":"1.0.0"}'
+
 # Create FastAPI app
 app = FastAPI(
     title="Product Extractor API",
     description="API for extracting and classifying product data using hybrid ML approach",
     version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
+    docs_url="/docs" if settings.enable_docs else None,
+    redoc_url="/redoc" if settings.enable_docs else None,
+    openapi_url="/openapi.json" if settings.enable_docs else None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.cors_origins,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
+# Compress larger responses (e.g. bulk comparisons); added after CORS so it wraps it
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -49,44 +103,82 @@ async def root():
     return await health_check()
 
 
-@app.get("/health", response_model=HealthResponse)
+@app.get("/health", response_model=None, responses={200: {"model": HealthResponse}})
 async def health():
-    # Health check endpoint
-    return await health_check()
+    # Health check endpoint, serves a constant body since load balancers poll it constantly
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
 
 
-@app.post("/api/process", response_model=ProcessResponse)
-async def process():
-    # Process products from daily data file
-    return await process_products()
+@app.post("/api/process", response_model=ProcessJobResponse, status_code=202)
+async def process(background_tasks: BackgroundTasks):
+    # Queue processing of the daily data file, returns a job id to poll
+    return await process_products(background_tasks)
 
 
-@app.get("/api/comparison/product", response_model=ProductComparisonSchema, tags=["Comparison"])
-async def get_product_comparison(product_name: str, period: str = "today"):
-    # Get price comparison for a specific product across all suppliers
-    return await get_product_comparison_route(product_name, period)
+@app.get("/api/process/{job_id}", response_model=ProcessJobStatusResponse)
+async def process_status(job_id: str):
+    # Get the status and result of a processing job
+    return await get_process_status(job_id)
 
 
-@app.on_event("startup")
-async def startup_event():
-    # Run on application startup
-    logger.info("Product Extractor API starting up...")
-    logger.info(f"Environment: {settings.app_env}")
-    logger.info(f"Debug mode: {settings.debug}")
+@app.get(
+    "/api/comparison/product",
+    response_model=None,
+    responses={200: {"model": ProductComparisonSchema}, 304: {"description": "Not modified"}},
+    tags=["Comparison"]
+)
+async def get_product_comparison(
+    product_name: str,
+    period: str = "today",
+    if_none_match: Optional[str] = Header(None)
+):
+    # Get price comparison for a specific product across all suppliers
+    return await get_product_comparison_route(product_name, period, if_none_match)
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    # Run on application shutdown
-    logger.info("Product Extractor API shutting down...")
+@app.get(
+    "/api/comparison/products",
+    response_model=None,
+    responses={200: {"model": List[ProductComparisonSchema]}},
+    tags=["Comparison"]
+)
+async def get_product_comparisons(
+    product_names: List[str] = Query(...),
+    period: str = "today"
+):
+    # Get price comparisons for several products in a single request
+    return await get_product_comparisons_route(product_names, period)
+
+
+@app.get(
+    "/api/comparison/products/stream",
+    response_model=None,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["Comparison"]
+)
+async def stream_product_comparisons(
+    product_names: List[str] = Query(...),
+    period: str = "today"
+):
+    # Stream price comparisons for several products as newline-delimited JSON
+    return await stream_product_comparisons_route(product_names, period)
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
     uvicorn.run(
         "backend.api.main:app",
         host=settings.api_host,
         port=settings.api_port,
+        # uvloop (installed with uvicorn[standard]) is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # uvicorn ignores workers when reload is enabled
+        workers=settings.workers,
+        limit_concurrency=settings.limit_concurrency,
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.timeout_keep_alive,
         reload=settings.debug
     )
 
@@ -2,61 +2,117 @@
 API routes for product processing and comparison.
 """
 
+import asyncio
+import hashlib
 import logging
-from fastapi import HTTPException, Query
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import orjson
+from fastapi import BackgroundTasks, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 
 from backend.api.schemas import (
     ProcessResponse,
+    ProcessJobResponse,
+    ProcessJobStatusResponse,
     HealthResponse,
     ProductComparisonSchema,
-    SupplierPriceSchema,
-    PriceStatisticsSchema,
 )
-from backend.services.product_service import process_daily_products
-from backend.services.product_comparison_service import get_comparison_service, ComparisonPeriod
+from backend.services.job_service import get_job_service
+from backend.services.product_comparison_service import (
+    get_comparison_service,
+    ComparisonPeriod,
+    ProductComparison,
+    SupplierPrice,
+    PriceStatistics,
+)
 from backend.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
-async def process_products() -> ProcessResponse:
-    # Process products from daily data file
+def _build_process_response(result: Dict[str, Any]) -> ProcessResponse:
+    # Convert a process_daily_products summary into the API response model
+    return ProcessResponse(
+        status=result["status"],
+        total_products=result["total_products"],
+        processed=result["processed"],
+        failed=result["failed"],
+        results=result["results"],
+        errors=result["errors"],
+        output_file=result.get("output_file")
+    )
+
+
+async def _run_processing_job(job_id: str, groq_api_key: str, data_directory: str) -> None:
+    # Run the processing pipeline for a queued job and record its outcome
+    job_service = get_job_service()
+
     try:
-        # Get API key from settings
-        settings = get_settings()
-        groq_api_key = settings.groq_api_key
-
-        if not groq_api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="GROQ_API_KEY is not configured. Please set it in the .env file."
-            )
-
-        # Call business logic
-        result = process_daily_products(groq_api_key, settings.data_directory)
-
-        # Return response
-        return ProcessResponse(
-            status=result["status"],
-            total_products=result["total_products"],
-            processed=result["processed"],
-            failed=result["failed"],
-            results=result["results"],
-            errors=result["errors"],
-            output_file=result.get("output_file")
+        job_service.mark_running(job_id)
+
+        # Imported here so the LangChain/Groq extraction stack is only loaded when
+        # processing actually runs, not when the app (and /health) starts; a broken
+        # install then fails the job instead of leaving it queued
+        from backend.services.product_service import process_daily_products
+
+        # The pipeline is long-running and blocking, so run it in a worker thread
+        # to keep the event loop free for other requests
+        result = await asyncio.to_thread(
+            process_daily_products,
+            groq_api_key,
+            data_directory
         )
+        job_service.mark_completed(job_id, result)
 
     except FileNotFoundError as e:
-        logger.error(f"File not found: {str(e)}")
-        raise HTTPException(status_code=404, detail=str(e))
+        job_service.mark_failed(job_id, f"File not found: {str(e)}")
 
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+        job_service.mark_failed(job_id, f"Validation error: {str(e)}")
 
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        job_service.mark_failed(job_id, f"Internal server error: {str(e)}")
+
+
+async def process_products(background_tasks: BackgroundTasks) -> ProcessJobResponse:
+    # Queue processing of the daily data file, returns a job id to poll for the result
+    settings = get_settings()
+    groq_api_key = settings.groq_api_key
+
+    if not groq_api_key:
+        raise HTTPException(
+            status_code=500,
+            detail="GROQ_API_KEY is not configured. Please set it in the .env file."
+        )
+
+    job = get_job_service().create_job()
+    background_tasks.add_task(
+        _run_processing_job,
+        job.job_id,
+        groq_api_key,
+        settings.data_directory
+    )
+
+    return ProcessJobResponse(job_id=job.job_id, status=job.status.value)
+
+
+async def get_process_status(job_id: str) -> ProcessJobStatusResponse:
+    # Get the status of a processing job, including its result once completed
+    job = get_job_service().get_job(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    return ProcessJobStatusResponse(
+        job_id=job.job_id,
+        status=job.status.value,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=_build_process_response(job.result) if job.result is not None else None,
+        error=job.error
+    )
 
 
 async def health_check() -> HealthResponse:
@@ -66,60 +122,178 @@ async def health_check() -> HealthResponse:
 
 # ==================== Comparison Routes ====================
 
-def _convert_comparison_to_schema(comparison) -> ProductComparisonSchema:
-    # Convert ProductComparison dataclass to Pydantic schema
-    return ProductComparisonSchema(
-        product_name=comparison.product_name,
-        normalized_name=comparison.normalized_name,
-        unit=comparison.unit,
-        category=comparison.category,
-        supplier_prices=[
-            SupplierPriceSchema(
-                supplier=sp.supplier,
-                price=sp.price,
-                currency=sp.currency,
-                date=sp.date
-            )
+# Valid period query values mapped to their enum members
+_PERIODS_BY_VALUE = {p.value: p for p in ComparisonPeriod}
+
+
+def _parse_period(period: str) -> ComparisonPeriod:
+    # Convert a period query value to ComparisonPeriod, raises a 400 error if invalid
+    period_enum = _PERIODS_BY_VALUE.get(period.lower())
+    if period_enum is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid period value: '{period}'. Expected one of: {', '.join(_PERIODS_BY_VALUE)}"
+        )
+    return period_enum
+
+
+def _comparison_to_dict(comparison) -> Dict[str, Any]:
+    # Project a ProductComparison dataclass onto the ProductComparisonSchema field layout
+    stats = comparison.statistics
+    return {
+        "product_name": comparison.product_name,
+        "normalized_name": comparison.normalized_name,
+        "unit": comparison.unit,
+        "category": comparison.category,
+        "supplier_prices": [
+            {
+                "supplier": sp.supplier,
+                "price": sp.price,
+                "currency": sp.currency,
+                "date": sp.date
+            }
             for sp in comparison.supplier_prices
         ],
-        statistics=PriceStatisticsSchema(
-            min_price=comparison.statistics.min_price,
-            max_price=comparison.statistics.max_price,
-            avg_price=comparison.statistics.avg_price,
-            supplier_count=comparison.statistics.supplier_count
-        ),
-        best_price_supplier=comparison.best_price_supplier,
-        worst_price_supplier=comparison.worst_price_supplier,
-        potential_savings_pct=comparison.potential_savings_pct,
-        potential_savings_amount=comparison.potential_savings_amount
+        "statistics": {
+            "min_price": stats.min_price,
+            "max_price": stats.max_price,
+            "avg_price": stats.avg_price,
+            "supplier_count": stats.supplier_count
+        },
+        "best_price_supplier": comparison.best_price_supplier,
+        "worst_price_supplier": comparison.worst_price_supplier,
+        "potential_savings_pct": comparison.potential_savings_pct,
+        "potential_savings_amount": comparison.potential_savings_amount
+    }
+
+
+def check_comparison_projection() -> None:
+    # Validate the _comparison_to_dict layout against ProductComparisonSchema once at startup,
+    # so the comparison routes can skip per-request Pydantic validation
+    fixture = ProductComparison(
+        product_name="Tomato",
+        normalized_name="tomato",
+        unit="kg",
+        category=None,
+        supplier_prices=[
+            SupplierPrice(supplier="supplier_a", price=4.5, currency="AED", date="2025-01-01"),
+            SupplierPrice(supplier="supplier_b", price=5.0, currency="AED", date="2025-01-01"),
+        ],
+        statistics=PriceStatistics(min_price=4.5, max_price=5.0, avg_price=4.75, supplier_count=2),
+        best_price_supplier="supplier_a",
+        worst_price_supplier="supplier_b",
+        potential_savings_pct=10.0,
+        potential_savings_amount=0.5
+    )
+    projected = _comparison_to_dict(fixture)
+    adapter = TypeAdapter(ProductComparisonSchema)
+    if adapter.dump_python(adapter.validate_python(projected)) != projected:
+        raise RuntimeError("Comparison response projection does not match ProductComparisonSchema")
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    # Check an If-None-Match header value against an entity tag
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _get_product_comparison(product_name: str, period: ComparisonPeriod) -> Optional[ProductComparison]:
+    # Look up one comparison, run in the threadpool since getting the service may also
+    # connect to MongoDB when the startup warmup failed
+    return get_comparison_service().get_product_comparison(
+        product_name=product_name,
+        period=period
     )
 
 
 async def get_product_comparison_route(
     product_name: str = Query(..., description="Product name to compare"),
-    period: str = Query("today", description="Time period: today, week, month, quarter, year, all")
-) -> ProductComparisonSchema:
+    period: str = Query("today", description="Time period: today, week, month, quarter, year, all"),
+    if_none_match: Optional[str] = Header(None)
+) -> Response:
     # Get price comparison for a specific product across all suppliers, returns detailed comparison
+    # or 304 Not Modified when the client already holds the same content
+    period_enum = _parse_period(period)
+
     try:
-        comparison_service = get_comparison_service()
-        period_enum = ComparisonPeriod(period.lower())
+        # The aggregation is a blocking pymongo call, so run it in the threadpool on a cache miss
+        comparison = await run_in_threadpool(_get_product_comparison, product_name, period_enum)
+    except Exception as e:
+        logger.error(f"Error getting product comparison: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-        comparison = comparison_service.get_product_comparison(
-            product_name=product_name,
-            period=period_enum
+    if not comparison:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Product '{product_name}' not found"
         )
 
-        if not comparison:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Product '{product_name}' not found"
-            )
+    content = orjson.dumps(_comparison_to_dict(comparison))
+    etag = f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag})
 
-        return _convert_comparison_to_schema(comparison)
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid period value: {str(e)}")
+
+def _get_product_comparisons(
+    product_names: List[str],
+    period: ComparisonPeriod
+) -> List[ProductComparison]:
+    # Look up several comparisons, run in the threadpool since getting the service may also
+    # connect to MongoDB when the startup warmup failed
+    return get_comparison_service().get_product_comparisons_bulk(
+        product_names=product_names,
+        period=period
+    )
+
+
+async def get_product_comparisons_route(
+    product_names: List[str] = Query(..., description="Product names to compare"),
+    period: str = Query("today", description="Time period: today, week, month, quarter, year, all")
+) -> ORJSONResponse:
+    # Get price comparisons for several products in one request, skipping products not found
+    period_enum = _parse_period(period)
+
+    try:
+        # The aggregation is a blocking pymongo call, so run it in the threadpool on a cache miss
+        comparisons = await run_in_threadpool(_get_product_comparisons, product_names, period_enum)
     except Exception as e:
-        logger.error(f"Error getting product comparison: {str(e)}")
+        logger.error(f"Error getting product comparisons: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+    return ORJSONResponse(content=[_comparison_to_dict(comparison) for comparison in comparisons])
+
+
+def _iter_ndjson(comparisons: Iterable) -> Iterator[bytes]:
+    # Serialize comparisons one JSON document per line as they are produced
+    try:
+        for comparison in comparisons:
+            yield orjson.dumps(_comparison_to_dict(comparison)) + b"\n"
+    except Exception as e:
+        # Headers are already sent, so the error can only be logged and the stream cut short
+        logger.error(f"Error streaming product comparisons: {str(e)}")
+        raise
+
+
+async def stream_product_comparisons_route(
+    product_names: List[str] = Query(..., description="Product names to compare"),
+    period: str = Query("today", description="Time period: today, week, month, quarter, year, all")
+) -> StreamingResponse:
+    # Stream price comparisons as NDJSON while the aggregation runs, skipping products not found
+    period_enum = _parse_period(period)
+
+    try:
+        # Creating the service connects to MongoDB if the startup warmup failed, so keep it off the loop
+        service = await run_in_threadpool(get_comparison_service)
+    except Exception as e:
+        logger.error(f"Error getting product comparisons: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    # A sync generator is iterated in the threadpool, keeping blocking cursor reads off the event loop
+    return StreamingResponse(
+        _iter_ndjson(service.iter_product_comparisons(product_names, period_enum)),
+        media_type="application/x-ndjson"
+    )
@@ -2,42 +2,72 @@
 API request and response schemas.
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Dict, Optional
 
 
 class ProcessResponse(BaseModel):
     # Response model for processed products
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     status: str = Field(..., description="Processing status")
     total_products: int = Field(..., description="Total number of products in input")
     processed: int = Field(..., description="Number of successfully processed products")
     failed: int = Field(..., description="Number of failed products")
-    results: List[Dict[str, Any]] = Field(..., description="List of processed product data")
+    # Items are passed through as opaque JSON objects, a bare list skips per-item key/value validation
+    results: list = Field(..., description="List of processed product data")
     errors: List[Dict[str, str]] = Field(default_factory=list, description="List of errors encountered")
     output_file: Optional[str] = Field(None, description="Output file path if saved")
 
 
+class ProcessJobResponse(BaseModel):
+    # Response returned when a processing job is queued
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    job_id: str = Field(..., description="Identifier to poll for the job result")
+    status: str = Field(..., description="Job status: queued, running, completed or failed")
+
+
+class ProcessJobStatusResponse(BaseModel):
+    # Status of a processing job, including its result once completed
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="Job status: queued, running, completed or failed")
+    created_at: datetime = Field(..., description="When the job was queued")
+    finished_at: Optional[datetime] = Field(None, description="When the job completed or failed")
+    result: Optional[ProcessResponse] = Field(None, description="Processing result once completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+
+
 class HealthResponse(BaseModel):
     # Health check response
 
-    status: str = Field(..., description="Service status")
-    version: str = Field(..., description="API version")
-
-    class Config:
-        # Pydantic model configuration
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "version": "1.0.0"
             }
         }
+    )
+
+    status: str = Field(..., description="Service status")
+    version: str = Field(..., description="API version")
 
 
 # ==================== Comparison API Schemas ====================
 
 class SupplierPriceSchema(BaseModel):
     # Schema for supplier price information
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     supplier: str
     price: float
     currency: str
@@ -46,6 +76,8 @@ class SupplierPriceSchema(BaseModel):
 
 class PriceStatisticsSchema(BaseModel):
     # Schema for price statistics
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     min_price: float
     max_price: float
     avg_price: float
@@ -54,6 +86,8 @@ class PriceStatisticsSchema(BaseModel):
 
 class ProductComparisonSchema(BaseModel):
     # Schema for product comparison response
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     product_name: str
     normalized_name: str
     unit: str
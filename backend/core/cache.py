@@ -0,0 +1,54 @@
+"""
+In-process caching utilities for Nabt application.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    # Thread-safe bounded cache where each entry expires after its own time-to-live
+
+    def __init__(self, maxsize: int = 1024):
+        # Initialize an empty cache holding at most maxsize entries
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        # Get a cached value, returns default if the key is missing or expired
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        # Store a value for ttl seconds, evicting the least recently used entry when full
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        # Remove all cached entries
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        # Number of entries currently stored, including ones not yet purged after expiry
+        return len(self._entries)
+
+
+# Sentinel distinguishing a cached None from a cache miss
+MISSING = object()
@@ -4,7 +4,7 @@ Configuration management for Nabt application.
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from functools import lru_cache
 from dotenv import load_dotenv
 
@@ -26,6 +26,10 @@ class Settings:
         self.mongodb_uri: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
         self.mongodb_database: str = os.getenv("MONGODB_DATABASE", "nabt")
         self.mongodb_collection: str = os.getenv("MONGODB_COLLECTION", "products")
+        self.mongodb_max_pool_size: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+        self.mongodb_min_pool_size: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+        # Wire compression in order of preference, empty to disable
+        self.mongodb_compressors: str = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
         
         # Application Settings
         self.app_env: str = os.getenv("APP_ENV", "development")
@@ -35,6 +39,32 @@ class Settings:
         # API Settings
         self.api_host: str = os.getenv("API_HOST", "0.0.0.0")
         self.api_port: int = int(os.getenv("API_PORT", "8000"))
+        # Serve /docs, /redoc and /openapi.json (disable in production)
+        self.enable_docs: bool = os.getenv("ENABLE_DOCS", "true").lower() == "true"
+        # Comma-separated origins allowed to call the API from a browser
+        self.cors_origins: List[str] = [
+            origin.strip()
+            for origin in os.getenv("CORS_ORIGINS", "http://localhost:8501").split(",")
+            if origin.strip()
+        ]
+
+        # Server Settings
+        # Processing jobs and comparison caches live in process memory, so a job queued on one
+        # worker cannot be polled on another; keep 1 worker unless those move to a shared store,
+        # then size with the usual (2 * CPU cores) + 1
+        self.workers: int = int(os.getenv("WORKERS", "1"))
+        self.limit_concurrency: int = int(os.getenv("LIMIT_CONCURRENCY", "512"))
+        self.backlog: int = int(os.getenv("BACKLOG", "2048"))
+        self.timeout_keep_alive: int = int(os.getenv("TIMEOUT_KEEP_ALIVE", "15"))
+        # Threads available to sync code offloaded from the event loop (Starlette default is 40)
+        self.threadpool_size: int = int(os.getenv("THREADPOOL_SIZE", "40"))
+        
+        # Processing Settings
+        # Maximum LLM requests (extraction and classification) in flight at once during a
+        # processing run; the limit is shared by all batches, so it may exceed the batch size
+        self.extract_concurrency: int = int(os.getenv("EXTRACT_CONCURRENCY", "8"))
+        if self.extract_concurrency < 1:
+            raise ValueError("EXTRACT_CONCURRENCY must be at least 1")
         
         # Data Settings - use absolute path
         data_dir = os.getenv("DATA_DIRECTORY", "data")
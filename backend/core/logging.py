@@ -2,21 +2,66 @@
 Logging configuration for Nabt application.
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
+# Background listener writing queued log records to stdout
+_queue_listener: Optional[QueueListener] = None
+
 
 def setup_logging(log_level: str = "INFO") -> None:
     # Setup application-wide logging configuration with specified level
+    # Records are queued by the logging thread and written to stdout by a background listener,
+    # so request and processing threads never block on stdout
+    global _queue_listener
+    stop_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    # The queue handler only merges the message arguments, the full line is formatted by the listener
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
     logging.basicConfig(
         level=getattr(logging, log_level.upper()),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
+            queue_handler
+        ],
+        force=True
     )
 
+    _queue_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def stop_logging() -> None:
+    # Stop the background listener, flushing any queued records, and swap its handlers back onto
+    # the root logger so records logged afterwards are written directly instead of queued and lost
+    global _queue_listener
+    if _queue_listener is None:
+        return
+
+    _queue_listener.stop()
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is _queue_listener.queue:
+            root_logger.removeHandler(handler)
+    for handler in _queue_listener.handlers:
+        root_logger.addHandler(handler)
+    _queue_listener = None
+
+
+# Flush queued records when the interpreter exits without an explicit shutdown
+atexit.register(stop_logging)
+
 
 def get_logger(name: str, log_level: Optional[str] = None) -> logging.Logger:
     # Get a logger instance with optional log level override
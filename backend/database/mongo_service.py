@@ -3,47 +3,76 @@ MongoDB service for product data storage.
 """
 
 import logging
+import os
 from typing import List, Dict, Any
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne
 from pymongo.errors import PyMongoError
-from datetime import datetime
+from datetime import date, datetime, time
 
 from backend.core.config import get_settings
 from backend.models.product import Product
 
 logger = logging.getLogger(__name__)
 
+# Maximum write operations sent to the server in one bulk_write call
+INSERT_CHUNK_SIZE = 1000
+
 class MongoDBService:
     # MongoDB service for managing product data
 
     def __init__(self):
         # Initialize MongoDB connection
         settings = get_settings()
-        self.client = MongoClient(settings.mongodb_uri)
+        client_options = {
+            "maxPoolSize": settings.mongodb_max_pool_size,
+            "minPoolSize": settings.mongodb_min_pool_size,
+        }
+        if settings.mongodb_compressors:
+            client_options["compressors"] = settings.mongodb_compressors
+        self.client = MongoClient(settings.mongodb_uri, **client_options)
         self.db = self.client[settings.mongodb_database]
         self.collection = self.db[settings.mongodb_collection]
         
         # Ensure indexes for faster queries
         self._create_indexes()
-        logger.info(f"MongoDB service initialized: {settings.mongodb_database}.{settings.mongodb_collection}")
+        self._migrate_string_dates()
+        logger.info("MongoDB service initialized: %s.%s", settings.mongodb_database, settings.mongodb_collection)
     
     def _create_indexes(self):
         # Create indexes for optimized queries
         try:
-            self.collection.create_index([("date", 1), ("name", 1)])
+            self.collection.create_index([("date", 1), ("name", 1), ("source", 1)])
+            # Lookup index for the (date, original_name, source) upsert filter in insert_products
+            self.collection.create_index([("date", 1), ("original_name", 1), ("source", 1)])
             self.collection.create_index([("date", 1), ("source", 1)])
             logger.info("MongoDB indexes created successfully")
         except PyMongoError as e:
-            logger.warning(f"Failed to create indexes: {e}")
+            logger.warning("Failed to create indexes: %s", e)
+    
+    def _migrate_string_dates(self):
+        # Convert documents stored with "YYYY-MM-DD" string dates to BSON dates (no-op once migrated),
+        # raises if the migration fails
+        try:
+            result = self.collection.update_many(
+                {"date": {"$type": "string"}},
+                [{"$set": {"date": {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d"}}}}]
+            )
+            if result.modified_count:
+                logger.info("Migrated %d products to BSON dates", result.modified_count)
+        except PyMongoError as e:
+            # Comparisons assume BSON dates (date filters, $dateToString), so no service instance is
+            # created half-migrated; get_mongo_service() retries the migration on its next call
+            logger.error("Failed to migrate product dates: %s", e)
+            raise
     
     def insert_products(self, products: List[Product]) -> Dict[str, Any]:
         # Insert products into MongoDB
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
+            # Stored as a BSON date (midnight of the upload day), smaller and cheaper to compare than a string
+            today = datetime.combine(date.today(), time.min)
             
-            docs = []
-            for p in products:
-                doc = {
+            docs = [
+                {
                     "date": today,
                     "name": p.ProductName,
                     "origin": p.Origin,
@@ -57,24 +86,66 @@ class MongoDBService:
                     "classification_method": p.ClassificationMethod,
                     "original_name": p.Original_name
                 }
-                docs.append(doc)
-            
+                for p in products
+            ]
+
+            # All documents share today's date, so (original_name, source) identifies repeats within
+            # the batch. The cleaned name drops origin, unit and descriptive words, so keying on it
+            # would merge e.g. two origins of the same product. Keep the last document of each,
+            # matching what a rerun's replace would store
+            unique_docs = {}
+            for doc in docs:
+                unique_docs[(doc["original_name"], doc["source"])] = doc
+            if len(unique_docs) < len(docs):
+                logger.info("Skipping %d duplicate products in batch", len(docs) - len(unique_docs))
+                docs = list(unique_docs.values())
+
             if docs:
-                result = self.collection.insert_many(docs)
-                logger.info(f"Inserted {len(result.inserted_ids)} products into MongoDB")
+                # Replace on (date, original_name, source) so re-running the day's processing refreshes
+                # prices instead of duplicating products. Unordered lets the server apply each
+                # chunk without stopping at the first error; writes stay acknowledged so failures
+                # are still reported
+                inserted_count = 0
+                updated_count = 0
+                for start in range(0, len(docs), INSERT_CHUNK_SIZE):
+                    result = self.collection.bulk_write(
+                        [
+                            ReplaceOne(
+                                {
+                                    "date": doc["date"],
+                                    "original_name": doc["original_name"],
+                                    "source": doc["source"]
+                                },
+                                doc,
+                                upsert=True
+                            )
+                            for doc in docs[start:start + INSERT_CHUNK_SIZE]
+                        ],
+                        ordered=False
+                    )
+                    inserted_count += result.upserted_count
+                    updated_count += result.modified_count
+
+                logger.info(
+                    "Inserted %d products into MongoDB, updated %d already stored",
+                    inserted_count,
+                    updated_count
+                )
                 return {
                     "status": "success",
-                    "inserted_count": len(result.inserted_ids)
+                    "inserted_count": inserted_count,
+                    "updated_count": updated_count
                 }
             else:
                 logger.warning("No products to insert")
                 return {
                     "status": "success",
-                    "inserted_count": 0
+                    "inserted_count": 0,
+                    "updated_count": 0
                 }
         
         except PyMongoError as e:
-            logger.error(f"Failed to insert products: {e}")
+            logger.error("Failed to insert products: %s", e)
             raise
     
     def close(self):
@@ -96,6 +167,25 @@ def get_mongo_service() -> MongoDBService:
     return _mongo_service
 
 
+def _reset_mongo_service_after_fork() -> None:
+    # MongoClient is not fork-safe, so a forked worker must create its own instead of
+    # reusing the parent's connection pool
+    global _mongo_service
+    _mongo_service = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_mongo_service_after_fork)
+
+
+def close_mongo_service() -> None:
+    # Close the MongoDB service instance if it was created
+    global _mongo_service
+    if _mongo_service is not None:
+        _mongo_service.close()
+        _mongo_service = None
+
+
 def upload_products(products: List[Product]) -> Dict[str, Any]:
     # Upload products to MongoDB
     service = get_mongo_service()
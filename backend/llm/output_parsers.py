@@ -0,0 +1,29 @@
+"""
+LLM Output Parsers
+Fast parsing of structured LLM responses.
+"""
+
+import re
+
+import orjson
+from langchain.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, ValidationError
+
+# Outermost JSON object in a response, skipping any surrounding prose or markdown fences
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.S)
+
+
+class OrjsonPydanticOutputParser(PydanticOutputParser):
+    # PydanticOutputParser that decodes responses with orjson, using LangChain's lenient
+    # parser only for responses orjson cannot handle (e.g. trailing commas, partial JSON)
+
+    def parse(self, text: str) -> BaseModel:
+        # Parse an LLM response into the configured pydantic model
+        match = _JSON_OBJECT_RE.search(text)
+        if match:
+            try:
+                return self.pydantic_object.model_validate(orjson.loads(match.group(0)))
+            except (orjson.JSONDecodeError, ValidationError):
+                pass
+
+        return super().parse(text)
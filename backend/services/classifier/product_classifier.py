@@ -1,5 +1,7 @@
+import asyncio
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 from backend.services.classifier.categories import ProductCategory, get_category_keywords
 from backend.llm.config import get_llm, is_llm_available
@@ -18,35 +20,69 @@ class ClassificationResult:
         self.method = method
 
 
+class KeywordEntry(NamedTuple):
+    # Precomputed match strings and base weight of a classification keyword
+    word: str  # Keyword padded with spaces, for the exact word match bonus
+    prefix: str  # Keyword followed by a space, for the beginning position bonus
+    base_weight: int
+    categories: Tuple[str, ...]  # Category values, so scoring never touches the enum
+
+
 class RuleBasedClassifier:
     # Rule-based product classifier using keyword matching
 
     def __init__(self):
         # Initialize rule-based classifier
         self.category_keywords = get_category_keywords()
-    
-    def classify_product(self, product_name: str) -> ClassificationResult:
-        # Classify product using keyword matching rules
-        product_lower = product_name.lower().strip()
-        
-        # Calculate scores for each category
-        category_scores = {}
-        
+        self.category_names = [category.value for category in self.category_keywords]
+
+        # Keywords grouped by first character, so a name is only checked against keywords starting
+        # with a character it contains. Each keyword is stored once, with the categories listing it
+        # (once per listing) and everything its weight needs precomputed
+        keyword_categories: Dict[str, List[ProductCategory]] = {}
         for category, keywords in self.category_keywords.items():
-            score = 0
-            
             for keyword in keywords:
+                keyword_categories.setdefault(keyword, []).append(category)
+
+        self.keywords_by_first_char: Dict[str, Dict[str, KeywordEntry]] = {}
+        for keyword, categories in keyword_categories.items():
+            self.keywords_by_first_char.setdefault(keyword[:1], {})[keyword] = KeywordEntry(
+                word=f' {keyword} ',
+                prefix=keyword + ' ',
+                base_weight=len(keyword) * 2,
+                categories=tuple(category.value for category in categories)
+            )
+
+        # Scraped names repeat across sources and days, so memoize results per normalized name
+        self._classify_normalized = lru_cache(maxsize=100_000)(self._score_product)
+
+    def _find_keywords(self, product_lower: str) -> Iterator[KeywordEntry]:
+        # Yield the entry of every keyword occurring in the name
+        for char in set(product_lower):
+            for keyword, entry in self.keywords_by_first_char.get(char, {}).items():
                 if keyword in product_lower:
-                    # Weight by keyword length and position
-                    weight = len(keyword) * 2
-                    if f' {keyword} ' in f' {product_lower} ':
-                        weight *= 2  # Exact word match bonus
-                    if product_lower.startswith(keyword + ' '):
-                        weight *= 1.5  # Beginning position bonus
-                    score += weight
-            
-            # Store raw score
-            category_scores[category] = score
+                    yield entry
+    
+    def classify_product(self, product_name: str) -> ClassificationResult:
+        # Classify product using keyword matching rules
+        return self._classify_normalized(product_name.lower().strip())
+
+    def _score_product(self, product_lower: str) -> ClassificationResult:
+        # Score a lowercased, stripped product name against every category
+        # Calculate scores for each category, starting from zero in category order
+        category_scores = dict.fromkeys(self.category_names, 0)
+        padded = f' {product_lower} '
+
+        for entry in self._find_keywords(product_lower):
+            # Weight by keyword length and position
+            weight = entry.base_weight
+            if entry.word in padded:
+                weight *= 2  # Exact word match bonus
+            if product_lower.startswith(entry.prefix):
+                weight *= 1.5  # Beginning position bonus
+
+            for category in entry.categories:
+                category_scores[category] += weight
         
         # Find best category
         if not category_scores or max(category_scores.values()) == 0:
@@ -72,7 +108,7 @@ class RuleBasedClassifier:
             confidence = 0.30
         
         return ClassificationResult(
-            category=best_category.value,
+            category=best_category,
             confidence=confidence,
             method="rule_based"
         )
@@ -92,11 +128,15 @@ class HybridProductClassifier:
                 self._setup_llm_prompt()
                 logger.info("LLM classification enabled")
             except Exception as e:
-                logger.warning(f"Failed to initialize LLM: {e}")
+                logger.warning("Failed to initialize LLM: %s", e)
                 self.llm_available = False
         
         # Build rule-based classifier
         self.rule_classifier = RuleBasedClassifier()
+
+        # Successful LLM classifications keyed by product name, so repeated names skip the round-trip
+        self._llm_cache: Dict[str, ClassificationResult] = {}
+
         logger.info("Hybrid classifier initialized")
     
     def _setup_llm_prompt(self):
@@ -110,55 +150,116 @@ class HybridProductClassifier:
         
         # If rule-based has high confidence, use it
         if rule_result.confidence > 0.85:
-            return ClassificationResult(
-                category=rule_result.category,
-                confidence=rule_result.confidence,
-                method="rule_based"
-            )
+            return rule_result
         
         # If LLM is available and rule-based confidence is low, use LLM
         if self.llm_available and rule_result.confidence <= 0.85:
             try:
-                llm_result = self._classify_with_llm(product_name)
-                return ClassificationResult(
-                    category=llm_result.category,
-                    confidence=llm_result.confidence,
-                    method="llm"
-                )
+                return self._classify_with_llm(product_name)
             except Exception as e:
-                logger.warning(f"LLM classification failed: {e}, using rule-based result")
+                logger.warning("LLM classification failed: %s, using rule-based result", e)
         
         # Fallback to rule-based result
-        return ClassificationResult(
-            category=rule_result.category,
-            confidence=rule_result.confidence,
-            method="rule_based"
-        )
+        return rule_result
     
+    def classify_batch(self, product_names: List[str]) -> List[ClassificationResult]:
+        # Classify several products, returns results in input order
+        # Repeated names are classified once and share the same result
+        results = {
+            product_name: self.classify_product(product_name)
+            for product_name in dict.fromkeys(product_names)
+        }
+        return [results[product_name] for product_name in product_names]
+
+    async def classify_product_async(
+        self,
+        product_name: str,
+        semaphore: asyncio.Semaphore
+    ) -> ClassificationResult:
+        # Classify product using hybrid approach without blocking the event loop,
+        # LLM requests are limited by the shared semaphore
+        rule_result = self.rule_classifier.classify_product(product_name)
+        if rule_result.confidence > 0.85 or not self.llm_available:
+            return rule_result
+
+        try:
+            return await self._classify_with_llm_async(product_name, semaphore)
+        except Exception as e:
+            logger.warning("LLM classification failed: %s, using rule-based result", e)
+            return rule_result
+
+    async def classify_batch_async(
+        self,
+        product_names: List[str],
+        semaphore: asyncio.Semaphore
+    ) -> List[ClassificationResult]:
+        # Classify several products with concurrent LLM fallbacks, returns results in input order
+        unique_names = list(dict.fromkeys(product_names))
+        classified = await asyncio.gather(*(
+            self.classify_product_async(product_name, semaphore)
+            for product_name in unique_names
+        ))
+        results = dict(zip(unique_names, classified))
+        return [results[product_name] for product_name in product_names]
+
     def _classify_with_llm(self, product_name: str) -> ClassificationResult:
+        # Classify using LLM, reusing the result for names already classified
+        cached = self._llm_cache.get(product_name)
+        if cached is not None:
+            return cached
+
+        result = self._request_llm_classification(product_name)
+        self._llm_cache[product_name] = result
+        return result
+
+    async def _classify_with_llm_async(
+        self,
+        product_name: str,
+        semaphore: asyncio.Semaphore
+    ) -> ClassificationResult:
+        # Classify using LLM without blocking the event loop, reusing the result for names already classified
+        cached = self._llm_cache.get(product_name)
+        if cached is not None:
+            return cached
+
+        async with semaphore:
+            result = await self._request_llm_classification_async(product_name)
+        self._llm_cache[product_name] = result
+        return result
+
+    def _request_llm_classification(self, product_name: str) -> ClassificationResult:
         # Classify using LLM
         try:
             response = self.llm.invoke(self.llm_prompt.format_messages(product_name=product_name))
-            category_name = response.content.strip()
-            
-            # Map to enum
-            try:
-                category = ProductCategory(category_name)
-                return ClassificationResult(
-                    category=category.value,
-                    confidence=0.9,  # High confidence for LLM
-                    method="llm"
-                )
-            except ValueError:
-                # If category not found, return Other
-                return ClassificationResult(
-                    category="Other",
-                    confidence=0.5,
-                    method="llm"
-                )
-                
         except Exception as e:
             raise Exception(f"LLM classification failed: {str(e)}")
+        return self._parse_llm_category(response.content)
+
+    async def _request_llm_classification_async(self, product_name: str) -> ClassificationResult:
+        # Classify using LLM with a non-blocking request
+        try:
+            response = await self.llm.ainvoke(self.llm_prompt.format_messages(product_name=product_name))
+        except Exception as e:
+            raise Exception(f"LLM classification failed: {str(e)}")
+        return self._parse_llm_category(response.content)
+
+    @staticmethod
+    def _parse_llm_category(content: str) -> ClassificationResult:
+        # Map an LLM category answer to a classification result
+        try:
+            category = ProductCategory(content.strip())
+            return ClassificationResult(
+                category=category.value,
+                confidence=0.9,  # High confidence for LLM
+                method="llm"
+            )
+        except ValueError:
+            # If category not found, return Other
+            return ClassificationResult(
+                category="Other",
+                confidence=0.5,
+                method="llm"
+            )
 
 
 def get_classifier(groq_api_key: Optional[str] = None) -> HybridProductClassifier:
@@ -10,6 +10,9 @@ from backend.services.extractor.patterns import ExtractionPatterns
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_WORD_RE = re.compile(r'[^\w]')
+
 
 class ProductNameCleaner:
     # Cleans product names by removing descriptive words, origin, and units
@@ -48,7 +51,7 @@ class ProductNameCleaner:
         clean_name = self.descriptive_regex.sub('', clean_name)
         
         # Clean up extra spaces
-        clean_name = re.sub(r'\s+', ' ', clean_name).strip()
+        clean_name = _WHITESPACE_RE.sub(' ', clean_name).strip()
         
         # Fallback: extract meaningful words if name too short
         if len(clean_name) < 2:
@@ -67,7 +70,7 @@ class ProductNameCleaner:
         
         # Find meaningful words (working backwards)
         for word in reversed(words):
-            word_clean = re.sub(r'[^\w]', '', word.lower())
+            word_clean = _NON_WORD_RE.sub('', word.lower())
             if len(word_clean) > 2 and word_clean not in exclude_words:
                 return word
         
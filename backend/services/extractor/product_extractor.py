@@ -3,20 +3,25 @@ Hybrid product data extraction assistant using regex for simple cases and LLM fo
 """
 
 import re
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel
-from langchain.output_parsers import PydanticOutputParser
 
+from backend.core.config import get_settings
 from backend.models.product import Product
 from backend.services.extractor.patterns import ExtractionPatterns
 from backend.services.extractor.cleaners import ProductNameCleaner, OriginExtractor, UnitExtractor
-from backend.services.classifier.product_classifier import get_classifier
+from backend.services.classifier.product_classifier import ClassificationResult, get_classifier
 from backend.llm.config import get_llm, is_llm_available
 from backend.llm.prompts import create_extraction_prompt
+from backend.llm.output_parsers import OrjsonPydanticOutputParser
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped from price strings before parsing (\d keeps Arabic-Indic digits, which float() accepts)
+_PRICE_STRIP_RE = re.compile(r'[^\d.,]')
+
 
 class HybridProductExtractor:
     # Hybrid product extractor: regex for simple cases, LLM for complex ones
@@ -28,6 +33,11 @@ class HybridProductExtractor:
         self.origin_extractor = OriginExtractor(self.patterns)
         self.unit_extractor = UnitExtractor(self.patterns)
         self.name_cleaner = ProductNameCleaner(self.patterns)
+
+        # Special characters and complexity keywords (anywhere in the lowercased name), matched in one scan
+        self.complexity_regex = re.compile(
+            r'[-/&()]|' + '|'.join(map(re.escape, sorted(self.patterns.COMPLEXITY_KEYWORDS)))
+        )
         
         # Initialize LLM components if available
         self.llm_available = is_llm_available(groq_api_key)
@@ -36,11 +46,11 @@ class HybridProductExtractor:
             try:
                 self.api_key = groq_api_key
                 self.llm = get_llm(groq_api_key, temperature=0)
-                self.output_parser = PydanticOutputParser(pydantic_object=Product)
+                self.output_parser = OrjsonPydanticOutputParser(pydantic_object=Product)
                 self._setup_llm_prompt()
                 logger.info("LLM extraction enabled")
             except Exception as e:
-                logger.error(f"Failed to initialize LLM: {e}")
+                logger.error("Failed to initialize LLM: %s", e)
                 self.llm_available = False
         
         # Initialize classifier
@@ -48,14 +58,11 @@ class HybridProductExtractor:
     
     def _is_complex_product_name(self, name: str) -> bool:
         # Determine if product name is complex enough to require LLM
-        complexity_indicators = [
-            len(name.split()) > 5,  # More than 5 words
-            any(keyword in name.lower() for keyword in self.patterns.COMPLEXITY_KEYWORDS),
-            any(char in name for char in ['-', '/', '&', '(', ')']),  # Special characters
-            len(name) > 50,  # Very long names
-        ]
-        
-        return any(complexity_indicators)
+        return (
+            len(name) > 50  # Very long names
+            or len(name.split()) > 5  # More than 5 words
+            or self.complexity_regex.search(name.lower()) is not None  # Special characters or complexity keywords
+        )
     
     def _setup_llm_prompt(self):
         # Setup LLM prompt template
@@ -63,12 +70,16 @@ class HybridProductExtractor:
     
     def _extract_price(self, price_str: Any) -> float:
         # Extract and parse price from string, returns float value
+        # Numeric prices (already parsed from JSON) need no cleanup
+        if isinstance(price_str, (int, float)) and not isinstance(price_str, bool):
+            return float(price_str)
+
         try:
-            price_clean = re.sub(r'[^\d.,]', '', str(price_str))
+            price_clean = _PRICE_STRIP_RE.sub('', str(price_str))
             price_clean = price_clean.replace(',', '.')
             return float(price_clean)
         except (ValueError, TypeError):
-            logger.warning(f"Could not parse price: {price_str}")
+            logger.warning("Could not parse price: %s", price_str)
             return 0.0
     
     def _extract_with_regex(self, raw_data: Dict[str, Any]) -> Product:
@@ -96,15 +107,19 @@ class HybridProductExtractor:
             ClassificationMethod=None
         )
     
+    def _format_llm_prompt(self, raw_data: Dict[str, Any]) -> List[Any]:
+        # Build the extraction prompt messages for a raw product row
+        return self.llm_prompt.format_messages(
+            name=raw_data.get('name', ''),
+            price=raw_data.get('price', '0'),
+            source=raw_data.get('source', ''),
+            format_instructions=self.output_parser.get_format_instructions()
+        )
+
     def _call_llm(self, raw_data: Dict[str, Any]) -> Product:
         # Call LLM for extraction
         try:
-            formatted_prompt = self.llm_prompt.format_messages(
-                name=raw_data.get('name', ''),
-                price=raw_data.get('price', '0'),
-                source=raw_data.get('source', ''),
-                format_instructions=self.output_parser.get_format_instructions()
-            )
+            formatted_prompt = self._format_llm_prompt(raw_data)
             
             response = self.llm.invoke(formatted_prompt)
             parsed_data = self.output_parser.parse(response.content)
@@ -113,6 +128,14 @@ class HybridProductExtractor:
             
         except Exception as e:
             raise Exception(f"LLM call failed: {str(e)}")
+
+    async def _call_llm_async(self, raw_data: Dict[str, Any]) -> Product:
+        # Call LLM for extraction without blocking the event loop
+        try:
+            response = await self.llm.ainvoke(self._format_llm_prompt(raw_data))
+            return self.output_parser.parse(response.content)
+        except Exception as e:
+            raise Exception(f"LLM call failed: {str(e)}")
         
     
     def _extract_with_llm(self, raw_data: Dict[str, Any]) -> Product:
@@ -121,31 +144,166 @@ class HybridProductExtractor:
             return self._call_llm(raw_data)
         except Exception as e:
             logger.warning(
-                f"LLM extraction failed for '{raw_data.get('name', '')}', "
-                f"falling back to regex: {e}"
+                "LLM extraction failed for '%s', falling back to regex: %s",
+                raw_data.get('name', ''),
+                e
+            )
+            return self._extract_with_regex(raw_data)
+
+    async def _extract_with_llm_async(
+        self,
+        raw_data: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Product:
+        # Extract product data using LLM with fallback to regex, limited by the shared semaphore
+        try:
+            async with semaphore:
+                return await self._call_llm_async(raw_data)
+        except Exception as e:
+            logger.warning(
+                "LLM extraction failed for '%s', falling back to regex: %s",
+                raw_data.get('name', ''),
+                e
             )
             return self._extract_with_regex(raw_data)
         
     
+    def _uses_llm(self, raw_data: Dict[str, Any]) -> bool:
+        # Check whether a row should be extracted with the LLM rather than regex
+        return self.llm_available and self._is_complex_product_name(raw_data.get('name', ''))
+
+    @staticmethod
+    def _apply_classification(product_data: Product, classification_result: ClassificationResult) -> Product:
+        # Copy a classification result onto an extracted product
+        product_data.Category = classification_result.category
+        product_data.Confidence = classification_result.confidence
+        product_data.ClassificationMethod = classification_result.method
+        return product_data
+
     def extract_product_data(self, raw_data: Dict[str, Any]) -> Product:
         # Extract and classify product data
         name = raw_data.get('name', '')
         
         # Choose extraction method
-        if self.llm_available and self._is_complex_product_name(name):
-            logger.debug(f"Using LLM extraction for: {name}")
+        if self._uses_llm(raw_data):
+            logger.debug("Using LLM extraction for: %s", name)
             product_data = self._extract_with_llm(raw_data)
         else:
-            logger.debug(f"Using regex extraction for: {name}")
+            logger.debug("Using regex extraction for: %s", name)
             product_data = self._extract_with_regex(raw_data)
         
         # Classify product
         classification_result = self.classifier.classify_product(product_data.ProductName)
-        product_data.Category = classification_result.category
-        product_data.Confidence = classification_result.confidence
-        product_data.ClassificationMethod = classification_result.method
-        
-        return product_data
+        return self._apply_classification(product_data, classification_result)
+
+    def extract_batch(self, raw_rows: List[Dict[str, Any]]) -> List[Product]:
+        # Extract and classify several products, returns products in input order
+        unique_rows, row_slots = self._dedupe_rows(raw_rows)
+        products, complex_indexes = self._extract_simple_rows(unique_rows)
+        for idx in complex_indexes:
+            products[idx] = self._extract_with_llm(unique_rows[idx])
+
+        return self._classify_batch(self._expand_duplicates(products, row_slots))
+
+    async def extract_batch_async(
+        self,
+        raw_rows: List[Dict[str, Any]],
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Product]:
+        # Extract and classify several products with concurrent LLM calls, returns products in input order
+        # Pass the same semaphore to concurrent batches so they share one cap on LLM requests in flight
+        unique_rows, row_slots = self._dedupe_rows(raw_rows)
+        products, complex_indexes = self._extract_simple_rows(unique_rows)
+
+        # Overlap LLM request latency, capped to stay within the API rate limit
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(get_settings().extract_concurrency)
+        extracted = await asyncio.gather(*(
+            self._extract_with_llm_async(unique_rows[idx], semaphore)
+            for idx in complex_indexes
+        ))
+        for idx, product_data in zip(complex_indexes, extracted):
+            products[idx] = product_data
+
+        return await self._classify_batch_async(self._expand_duplicates(products, row_slots), semaphore)
+
+    @staticmethod
+    def _dedupe_rows(raw_rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        # Collapse rows with the same name, price and source (the extraction inputs),
+        # returns the unique rows and, per input row, the index of its unique row
+        slot_by_key: Dict[Tuple[str, str, str], int] = {}
+        unique_rows = []
+        row_slots = []
+        for raw_data in raw_rows:
+            key = (
+                raw_data.get('name', ''),
+                str(raw_data.get('price', '0')),
+                raw_data.get('source', '')
+            )
+            slot = slot_by_key.get(key)
+            if slot is None:
+                slot = slot_by_key[key] = len(unique_rows)
+                unique_rows.append(raw_data)
+            row_slots.append(slot)
+        return unique_rows, row_slots
+
+    @staticmethod
+    def _expand_duplicates(products: List[Product], row_slots: List[int]) -> List[Product]:
+        # Map unique extracted products back to every input row, copying repeats since products are mutated
+        expanded = []
+        used = set()
+        for slot in row_slots:
+            product_data = products[slot]
+            if slot in used:
+                product_data = product_data.model_copy()
+            used.add(slot)
+            expanded.append(product_data)
+        return expanded
+
+    def _extract_simple_rows(
+        self,
+        raw_rows: List[Dict[str, Any]]
+    ) -> Tuple[List[Optional[Product]], List[int]]:
+        # Extract rows with simple names via regex, returns partial products and the indexes left for the LLM
+        products: List[Optional[Product]] = [None] * len(raw_rows)
+        complex_indexes = []
+        for idx, raw_data in enumerate(raw_rows):
+            if self._uses_llm(raw_data):
+                complex_indexes.append(idx)
+            else:
+                products[idx] = self._extract_with_regex(raw_data)
+
+        logger.debug(
+            "Extracting batch of %d products, %d with LLM",
+            len(raw_rows),
+            len(complex_indexes)
+        )
+        return products, complex_indexes
+
+    def _classify_batch(self, products: List[Product]) -> List[Product]:
+        # Classify extracted products in one pass
+        classification_results = self.classifier.classify_batch(
+            [product_data.ProductName for product_data in products]
+        )
+        return [
+            self._apply_classification(product_data, classification_result)
+            for product_data, classification_result in zip(products, classification_results)
+        ]
+
+    async def _classify_batch_async(
+        self,
+        products: List[Product],
+        semaphore: asyncio.Semaphore
+    ) -> List[Product]:
+        # Classify extracted products, sending LLM fallbacks concurrently under the shared semaphore
+        classification_results = await self.classifier.classify_batch_async(
+            [product_data.ProductName for product_data in products],
+            semaphore
+        )
+        return [
+            self._apply_classification(product_data, classification_result)
+            for product_data, classification_result in zip(products, classification_results)
+        ]
 
 
 def create_extractor(groq_api_key: Optional[str] = None) -> HybridProductExtractor:
@@ -0,0 +1,98 @@
+"""
+Processing Job Service
+Tracks background product processing runs so clients can poll for their results.
+"""
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    # Lifecycle states of a processing job
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass(slots=True)
+class ProcessingJob:
+    # State of a single processing run
+    job_id: str
+    status: JobStatus
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class JobService:
+    # In-memory registry of processing jobs, keeping only the most recent ones
+
+    MAX_JOBS = 100
+
+    def __init__(self):
+        # Initialize an empty job registry
+        self._jobs: "OrderedDict[str, ProcessingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_job(self) -> ProcessingJob:
+        # Register a new queued job
+        job = ProcessingJob(
+            job_id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            created_at=datetime.now()
+        )
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.MAX_JOBS:
+                self._jobs.popitem(last=False)
+        logger.info(f"Processing job {job.job_id} queued")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ProcessingJob]:
+        # Get a job by id, returns None if unknown or already evicted
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def mark_running(self, job_id: str) -> None:
+        # Mark a job as started
+        self._update(job_id, status=JobStatus.RUNNING)
+
+    def mark_completed(self, job_id: str, result: Dict[str, Any]) -> None:
+        # Store the result of a finished job
+        self._update(job_id, status=JobStatus.COMPLETED, result=result, finished_at=datetime.now())
+        logger.info(f"Processing job {job_id} completed")
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        # Store the error of a failed job
+        self._update(job_id, status=JobStatus.FAILED, error=error, finished_at=datetime.now())
+        logger.error(f"Processing job {job_id} failed: {error}")
+
+    def _update(self, job_id: str, **changes: Any) -> None:
+        # Apply field changes to a job if it is still tracked
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for field_name, value in changes.items():
+                setattr(job, field_name, value)
+
+
+# Singleton instance
+_job_service_instance = None
+
+
+def get_job_service() -> JobService:
+    # Get singleton instance of JobService
+    global _job_service_instance
+    if _job_service_instance is None:
+        _job_service_instance = JobService()
+    return _job_service_instance
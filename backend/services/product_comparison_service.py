@@ -1,15 +1,25 @@
 """
 Product Comparison Service
 """
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import statistics
-from collections import defaultdict
 
+from pymongo.errors import PyMongoError
+
+from backend.core.cache import MISSING, TTLCache
 from backend.database.mongo_service import get_mongo_service
 
+logger = logging.getLogger(__name__)
+
+# Case-insensitive collation shared by the name index and comparison queries
+NAME_COLLATION = {"locale": "en", "strength": 2}
+
 
 class ComparisonPeriod(str, Enum):
     # Time period for price comparisons
@@ -21,7 +31,7 @@ class ComparisonPeriod(str, Enum):
     ALL = "all"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SupplierPrice:
     # Represents a supplier's price for a specific product
     supplier: str
@@ -31,7 +41,7 @@ class SupplierPrice:
     last_updated: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PriceStatistics:
     # Statistical analysis of prices across suppliers
     min_price: float
@@ -40,7 +50,7 @@ class PriceStatistics:
     supplier_count: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProductComparison:
     # Complete comparison data for a single product
     product_name: str
@@ -55,7 +65,7 @@ class ProductComparison:
     potential_savings_amount: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SavingsOpportunity:
     # Represents a potential cost-saving opportunity
     product_name: str
@@ -68,7 +78,7 @@ class SavingsOpportunity:
     category: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PriceTrend:
     # Price trend data for a product over time
     product_name: str
@@ -79,58 +89,244 @@ class PriceTrend:
     volatility_score: float
 
 
-def _calculate_statistics(prices: List[float]) -> PriceStatistics:
-    # Calculate statistical measures for a list of prices
-    if not prices:
-        return PriceStatistics(0, 0, 0, 0)
-
-    min_price = min(prices)
-    max_price = max(prices)
-    avg_price = statistics.mean(prices)
+def _build_group_stages(search_key: Optional[Dict] = None) -> List[Dict]:
+    # Build $group stages: latest entry per supplier, then one document per search term
+    if search_key is None:
+        supplier_id, supplier_ref, result_id = "$source", "$_id", None
+    else:
+        supplier_id = {"search": search_key, "source": "$source"}
+        supplier_ref, result_id = "$_id.source", "$_id.search"
+
+    return [
+        # Keep only the latest entry per supplier
+        {"$group": {
+            "_id": supplier_id,
+            "price": {"$first": "$price"},
+            "currency": {"$first": "$currency"},
+            "date": {"$first": "$date"},
+            "unit": {"$first": "$unit"},
+            "category": {"$first": "$category"},
+        }},
+        # Collapse suppliers into a single document with statistics, pushing only
+        # the per-supplier fields; unit and category are returned once
+        {"$group": {
+            "_id": result_id,
+            # Defaults are filled in server-side so every pushed supplier has all four fields
+            "suppliers": {"$push": {
+                "supplier": {"$ifNull": [supplier_ref, "Unknown"]},
+                "price": {"$ifNull": ["$price", 0.0]},
+                "currency": {"$ifNull": ["$currency", "SAR"]},
+                "date": {"$ifNull": [
+                    {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+                    ""
+                ]},
+            }},
+            "unit": {"$first": "$unit"},
+            "category": {"$first": "$category"},
+            "min_price": {"$min": "$price"},
+            "max_price": {"$max": "$price"},
+            "avg_price": {"$avg": "$price"},
+            "supplier_count": {"$sum": 1},
+        }},
+    ]
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Exclusive upper bound of the names starting with prefix; U+FFFF sorts after every
+    # other character, also under NAME_COLLATION
+    return prefix + "\uffff"
+
+
+def _build_comparison_pipeline(query: Dict) -> List[Dict]:
+    # Build aggregation pipeline returning latest price per supplier plus price statistics
+    return [
+        {"$match": query},
+        {"$sort": {"date": -1}},
+        *_build_group_stages(),
+    ]
+
+
+def _build_bulk_comparison_pipeline(product_names: List[str], date_filter: Dict) -> List[Dict]:
+    # Build aggregation pipeline returning one comparison document per searched product name
+    # (run with NAME_COLLATION so the prefix ranges are case-insensitive)
+    bounds = [(name, _prefix_upper_bound(name)) for name in product_names]
+
+    # Resolve each document to the first search term whose prefix range contains it
+    search_key = {"$switch": {
+        "branches": [
+            {
+                "case": {"$and": [{"$gte": ["$name", lower]}, {"$lt": ["$name", upper]}]},
+                "then": lower,
+            }
+            for lower, upper in bounds
+        ],
+        "default": None,
+    }}
+
+    return [
+        {"$match": {
+            "$or": [{"name": {"$gte": lower, "$lt": upper}} for lower, upper in bounds],
+            **date_filter
+        }},
+        {"$sort": {"date": -1}},
+        # The search term is computed inside the $group key rather than in an
+        # $addFields stage, keeping the pipeline to $match -> $sort -> $group
+        *_build_group_stages(search_key),
+    ]
+
+
+# Unpacks a supplier entry pushed by the comparison pipeline
+_SUPPLIER_FIELDS = itemgetter("supplier", "price", "currency", "date")
+
+
+def _build_comparison(product_name: str, result: Dict, now: datetime) -> ProductComparison:
+    # Build a ProductComparison from a grouped comparison pipeline document
+    # Create SupplierPrice objects, tracking best and worst suppliers in the same pass
+    supplier_prices: List[SupplierPrice] = []
+    best_supplier: Optional[SupplierPrice] = None
+    worst_supplier: Optional[SupplierPrice] = None
+    for supplier in result["suppliers"]:
+        name, price, currency, updated = _SUPPLIER_FIELDS(supplier)
+        sp = SupplierPrice(
+            supplier=name,
+            price=price,
+            currency=currency,
+            date=updated,
+            last_updated=now
+        )
+        supplier_prices.append(sp)
+
+        if best_supplier is None or sp.price < best_supplier.price:
+            best_supplier = sp
+        if worst_supplier is None or sp.price > worst_supplier.price:
+            worst_supplier = sp
+
+    # Statistics are computed server-side by the $group stage
+    stats = PriceStatistics(
+        min_price=result["min_price"] or 0.0,
+        max_price=result["max_price"] or 0.0,
+        avg_price=result["avg_price"] or 0.0,
+        supplier_count=result["supplier_count"]
+    )
 
-    return PriceStatistics(
-        min_price=min_price,
-        max_price=max_price,
-        avg_price=avg_price,
-        supplier_count=len(prices)
+    # Calculate potential savings
+    if stats.max_price > 0:
+        savings_pct = ((stats.max_price - stats.min_price) / stats.max_price) * 100
+        savings_amount = stats.max_price - stats.min_price
+    else:
+        savings_pct = 0.0
+        savings_amount = 0.0
+
+    unit = result["unit"] or ""
+    normalized_name = product_name.lower().strip()
+
+    return ProductComparison(
+        product_name=product_name,
+        normalized_name=normalized_name,
+        unit=unit,
+        category=result["category"],
+        supplier_prices=supplier_prices,
+        statistics=stats,
+        best_price_supplier=best_supplier.supplier,
+        worst_price_supplier=worst_supplier.supplier,
+        potential_savings_pct=savings_pct,
+        potential_savings_amount=savings_amount
     )
 
 
-def _get_date_filter(period: ComparisonPeriod) -> Dict:
-    # Get MongoDB date filter based on comparison period
-    if period == ComparisonPeriod.ALL:
+# Number of days covered by each bounded comparison period
+_PERIOD_DAYS = {
+    ComparisonPeriod.TODAY: 0,
+    ComparisonPeriod.WEEK: 7,
+    ComparisonPeriod.MONTH: 30,
+    ComparisonPeriod.QUARTER: 90,
+    ComparisonPeriod.YEAR: 365,
+}
+
+
+# Seconds a cached comparison stays valid; short periods change most when new data lands
+_PERIOD_CACHE_TTL = {
+    ComparisonPeriod.TODAY: 300,
+    ComparisonPeriod.WEEK: 3600,
+    ComparisonPeriod.MONTH: 21600,
+    ComparisonPeriod.QUARTER: 21600,
+    ComparisonPeriod.YEAR: 86400,
+    ComparisonPeriod.ALL: 86400,
+}
+
+
+@lru_cache(maxsize=16)
+def _build_date_filter(period: ComparisonPeriod, end_date: date) -> Dict:
+    # Build MongoDB date filter for a period ending on the given day (cached, do not mutate)
+    days = _PERIOD_DAYS.get(period)
+    if days is None:
         return {}
 
-    end_date = datetime.now()
-
-    if period == ComparisonPeriod.TODAY:
-        start_date = end_date
-    elif period == ComparisonPeriod.WEEK:
-        start_date = end_date - timedelta(days=7)
-    elif period == ComparisonPeriod.MONTH:
-        start_date = end_date - timedelta(days=30)
-    elif period == ComparisonPeriod.QUARTER:
-        start_date = end_date - timedelta(days=90)
-    elif period == ComparisonPeriod.YEAR:
-        start_date = end_date - timedelta(days=365)
-    else:
-        return {}
+    # Equality on a single day gives the planner a tighter index bound than a range
+    # Products are stored with a BSON date at midnight of their upload day
+    end = datetime.combine(end_date, time.min)
+    if days == 0:
+        return {"date": end}
 
     return {
         "date": {
-            "$gte": start_date.strftime("%Y-%m-%d"),
-            "$lte": end_date.strftime("%Y-%m-%d")
+            "$gte": end - timedelta(days=days),
+            "$lte": end
         }
     }
 
 
+def _dedupe_names(product_names: List[str]) -> List[str]:
+    # Drop empty and repeated product names, keeping first-seen order
+    return list(dict.fromkeys(name for name in product_names if name))
+
+
+def _get_date_filter(period: ComparisonPeriod) -> Dict:
+    # Get MongoDB date filter based on comparison period, keyed by today's date
+    return _build_date_filter(period, date.today())
+
+
 class ProductComparisonService:
     # Service for comparing product prices across multiple suppliers
 
+    _indexes_created = False
+
     def __init__(self):
         # Initialize the comparison service with MongoDB connection
         self.mongo_service = get_mongo_service()
         self.collection = self.mongo_service.collection
+        self._create_indexes()
+
+        # Comparison results keyed by (product_name, period, day), or by (names, period, day)
+        # for bulk requests, expiring per period granularity
+        self._comparison_cache = TTLCache(maxsize=1024)
+
+    def _create_indexes(self):
+        # Create the collation-aware index backing comparison queries (once per process)
+        if ProductComparisonService._indexes_created:
+            return
+        try:
+            self.collection.create_index(
+                [("name", 1), ("source", 1), ("date", -1)],
+                collation=NAME_COLLATION
+            )
+            # Text index for word matches anywhere in the name
+            self.collection.create_index([("name", "text")])
+            ProductComparisonService._indexes_created = True
+            logger.info("Comparison indexes created successfully")
+        except PyMongoError as e:
+            logger.warning(f"Failed to create comparison indexes: {e}")
+
+    def _aggregate_comparison(self, query: Dict, collation: Optional[Dict] = None) -> Optional[Dict]:
+        # Run the comparison pipeline for a query, returns the grouped result or None
+        return next(
+            self.collection.aggregate(_build_comparison_pipeline(query), collation=collation),
+            None
+        )
+
+    def clear_cache(self):
+        # Drop cached comparison results, e.g. after new products are uploaded
+        self._comparison_cache.clear()
 
     def get_product_comparison(
         self,
@@ -138,79 +334,96 @@ class ProductComparisonService:
         period: ComparisonPeriod = ComparisonPeriod.TODAY
     ) -> Optional[ProductComparison]:
         # Get price comparison for a specific product across all suppliers
-        date_filter = _get_date_filter(period)
+        key = (product_name, period, date.today())
+        comparison = self._comparison_cache.get(key, MISSING)
+        if comparison is MISSING:
+            comparison = self._compute_product_comparison(*key)
+            self._comparison_cache.set(key, comparison, _PERIOD_CACHE_TTL[period])
+        return comparison
+
+    def _compute_product_comparison(
+        self,
+        product_name: str,
+        period: ComparisonPeriod,
+        day: date
+    ) -> Optional[ProductComparison]:
+        # Query MongoDB for a product comparison over the period ending on the given day
+        date_filter = _build_date_filter(period, day)
 
-        # Query all matching products (without unit filter)
-        query = {
-            "name": {"$regex": product_name, "$options": "i"},
+        # Query all products whose name starts with the search term (without unit filter),
+        # as a range on the case-insensitive collation index rather than an /i regex
+        prefix_query = {
+            "name": {"$gte": product_name, "$lt": _prefix_upper_bound(product_name)},
             **date_filter
         }
+        result = self._aggregate_comparison(prefix_query, NAME_COLLATION)
 
-        products = list(self.collection.find(query))
+        if not result:
+            # Fall back to the text index for names containing the term as a phrase
+            phrase = product_name.replace('"', " ").strip()
+            if phrase:
+                text_query = {"$text": {"$search": f'"{phrase}"'}, **date_filter}
+                result = self._aggregate_comparison(text_query)
 
-        if not products:
+        if not result:
             return None
 
-        # Group by supplier and get latest price
-        supplier_prices: List[SupplierPrice] = []
-        prices_only: List[float] = []
-
-        supplier_latest = {}
-        for product in products:
-            supplier = product.get("source", "Unknown")
-            date = product.get("date", "")
-
-            # Keep only the latest entry per supplier
-            if supplier not in supplier_latest or date > supplier_latest[supplier]["date"]:
-                supplier_latest[supplier] = product
-
-        # Create SupplierPrice objects
-        for supplier, product in supplier_latest.items():
-            price = product.get("price", 0.0)
-            sp = SupplierPrice(
-                supplier=supplier,
-                price=price,
-                currency=product.get("currency", "SAR"),
-                date=product.get("date", ""),
-                last_updated=datetime.now()
-            )
-            supplier_prices.append(sp)
-            prices_only.append(price)
+        return _build_comparison(product_name, result, datetime.now())
 
-        if not prices_only:
-            return None
+    def get_product_comparisons_bulk(
+        self,
+        product_names: List[str],
+        period: ComparisonPeriod = ComparisonPeriod.TODAY
+    ) -> List[ProductComparison]:
+        # Get price comparisons for several products in a single aggregation round-trip
+        names = _dedupe_names(product_names)
+        if not names:
+            return []
+
+        # Keyed by the whole name list: each document is assigned to the first name it matches,
+        # so a name's comparison depends on the other names requested with it
+        key = (tuple(names), period, date.today())
+        comparisons = self._comparison_cache.get(key, MISSING)
+        if comparisons is MISSING:
+            comparisons = self._compute_product_comparisons_bulk(names, period)
+            self._comparison_cache.set(key, comparisons, _PERIOD_CACHE_TTL[period])
+        return comparisons
+
+    def _compute_product_comparisons_bulk(
+        self,
+        names: List[str],
+        period: ComparisonPeriod
+    ) -> List[ProductComparison]:
+        # Query MongoDB for comparisons of several deduplicated product names
+        # At most one document per name, so size the first batch to fetch them all at once
+        cursor = self._aggregate_bulk(names, period, batchSize=len(names))
+        results = {doc["_id"]: doc for doc in cursor}
+
+        now = datetime.now()
+        return [
+            _build_comparison(name, results[name], now)
+            for name in names
+            if name in results
+        ]
+
+    def iter_product_comparisons(
+        self,
+        product_names: List[str],
+        period: ComparisonPeriod = ComparisonPeriod.TODAY
+    ) -> Iterator[ProductComparison]:
+        # Yield price comparisons as the aggregation cursor returns them (database order, not input order)
+        names = _dedupe_names(product_names)
+        if not names:
+            return
 
-        # Calculate statistics
-        stats = _calculate_statistics(prices_only)
-
-        # Find best and worst suppliers
-        best_supplier = min(supplier_prices, key=lambda x: x.price)
-        worst_supplier = max(supplier_prices, key=lambda x: x.price)
-
-        # Calculate potential savings
-        if stats.max_price > 0:
-            savings_pct = ((stats.max_price - stats.min_price) / stats.max_price) * 100
-            savings_amount = stats.max_price - stats.min_price
-        else:
-            savings_pct = 0.0
-            savings_amount = 0.0
-
-        # Get the most common unit from the products
-        unit = products[0].get("unit", "")
-        normalized_name = product_name.lower().strip()
-
-        return ProductComparison(
-            product_name=product_name,
-            normalized_name=normalized_name,
-            unit=unit,
-            category=products[0].get("category"),
-            supplier_prices=supplier_prices,
-            statistics=stats,
-            best_price_supplier=best_supplier.supplier,
-            worst_price_supplier=worst_supplier.supplier,
-            potential_savings_pct=savings_pct,
-            potential_savings_amount=savings_amount
-        )
+        now = datetime.now()
+        for doc in self._aggregate_bulk(names, period):
+            yield _build_comparison(doc["_id"], doc, now)
+
+    def _aggregate_bulk(self, names: List[str], period: ComparisonPeriod, **kwargs):
+        # Run the bulk comparison pipeline, returns the aggregation cursor
+        pipeline = _build_bulk_comparison_pipeline(names, _get_date_filter(period))
+        return self.collection.aggregate(pipeline, collation=NAME_COLLATION, **kwargs)
 
 
 # Singleton instance
@@ -222,4 +435,20 @@ def get_comparison_service() -> ProductComparisonService:
     global _comparison_service_instance
     if _comparison_service_instance is None:
         _comparison_service_instance = ProductComparisonService()
-    return _comparison_service_instance
\ No newline at end of file
+    return _comparison_service_instance
+
+
+def _reset_comparison_service_after_fork():
+    # Drop the instance in forked workers, it holds a collection bound to the parent's MongoClient
+    global _comparison_service_instance
+    _comparison_service_instance = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_comparison_service_after_fork)
+
+
+def invalidate_comparison_cache():
+    # Clear cached comparisons if the service has been created
+    if _comparison_service_instance is not None:
+        _comparison_service_instance.clear_cache()
@@ -1,15 +1,25 @@
-import json
+import asyncio
 import os
+import orjson
 from datetime import datetime
 from typing import List, Dict, Any, Tuple
 import logging
+from pydantic import TypeAdapter
 
+from backend.core.config import get_settings
 from backend.services.extractor.product_extractor import create_extractor
 from backend.database.mongo_service import upload_products
+from backend.services.product_comparison_service import invalidate_comparison_cache
 from backend.models.product import Product
 
 logger = logging.getLogger(__name__)
 
+# Serializes processed products for the response and output file
+_PRODUCT_LIST_ADAPTER = TypeAdapter(List[Product])
+
+# Number of products extracted together; a batch that fails is retried product by product
+EXTRACT_BATCH_SIZE = 16
+
 
 class ProductService:
     # Service class for handling product processing business logic
@@ -26,9 +36,9 @@ class ProductService:
             raise FileNotFoundError(f"Data file not found: {filepath}")
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        except orjson.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON file: {str(e)}")
         
         if 'data' not in data:
@@ -41,23 +51,67 @@ class ProductService:
         products: List[Dict[str, Any]]
     ) -> Tuple[List[Dict[str, Any]], List[Product], List[Dict[str, str]]]:
         # Process a list of products, returns results, product objects, and errors
-        results = []
+        # Runs on a worker thread, so the batches get their own event loop for concurrent LLM calls
+        return asyncio.run(self._process_products_async(products))
+
+    async def _process_products_async(
+        self,
+        products: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Product], List[Dict[str, str]]]:
+        # Extract all batches concurrently, keeping input order in the results
+        # One semaphore caps the LLM requests in flight across the whole run, so a slow call
+        # only holds up its own batch
+        semaphore = asyncio.Semaphore(get_settings().extract_concurrency)
+        batch_outcomes = await asyncio.gather(*(
+            self._process_batch(products[start:start + EXTRACT_BATCH_SIZE], start, semaphore)
+            for start in range(0, len(products), EXTRACT_BATCH_SIZE)
+        ))
+
         product_objects = []
         errors = []
-        
-        for idx, product in enumerate(products, 1):
+        for batch_products, batch_errors in batch_outcomes:
+            # Store Product objects for MongoDB
+            product_objects.extend(batch_products)
+            errors.extend(batch_errors)
+
+        # Convert to dicts for response/file in a single serialization pass
+        results = _PRODUCT_LIST_ADAPTER.dump_python(product_objects)
+        return results, product_objects, errors
+
+    async def _process_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        offset: int,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[List[Product], List[Dict[str, str]]]:
+        # Extract one batch, returns its products and errors
+        logger.info("Processing products %d-%d", offset + 1, offset + len(batch))
+        try:
+            return await self.extractor.extract_batch_async(batch, semaphore), []
+        except Exception as e:
+            # Retry the batch product by product so a single bad row only fails itself
+            logger.warning(
+                "Batch extraction failed for products %d-%d, processing individually: %s",
+                offset + 1,
+                offset + len(batch),
+                e
+            )
+            return await self._process_individually(batch, offset, semaphore)
+
+    async def _process_individually(
+        self,
+        batch: List[Dict[str, Any]],
+        offset: int,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[List[Product], List[Dict[str, str]]]:
+        # Extract products one at a time, recording a per-product error for each failure
+        product_objects = []
+        errors = []
+        for idx, product in enumerate(batch, offset + 1):
             try:
-                logger.info(f"Processing product {idx}/{len(products)}: {product.get('name', 'Unknown')}")
-                
                 # Extract product data
-                extracted = self.extractor.extract_product_data(product)
-                
-                # Store Product object for MongoDB
-                product_objects.append(extracted)
-                
-                # Convert to dict for response/file
-                result = extracted.model_dump()
-                results.append(result)
+                extracted_batch = await self.extractor.extract_batch_async([product], semaphore)
+                product_objects.extend(extracted_batch)
                 
             except Exception as e:
                 error_msg = f"Failed to process product {idx}: {product.get('name', 'Unknown')} - {str(e)}"
@@ -67,19 +121,21 @@ class ProductService:
                     "product_name": product.get('name', 'Unknown'),
                     "error": str(e)
                 })
-        
-        return results, product_objects, errors
+        return product_objects, errors
     
     def save_results_to_file(self, results: List[Dict[str, Any]], output_filename: str) -> None:
         # Save processing results to JSON file
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2)
+        with open(output_filename, 'wb') as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
         logger.info(f"Results saved to {output_filename}")
     
     def upload_to_mongodb(self, product_objects: List[Product]) -> Dict[str, Any]:
         # Upload products to MongoDB
         save_result = upload_products(product_objects)
         logger.info(f"MongoDB save result: {save_result}")
+
+        # New prices make cached comparisons stale
+        invalidate_comparison_cache()
         return save_result
 
 
@@ -64,19 +64,17 @@ st.markdown("""
 # Initialize API client
 api_client = get_api_client()
 
+# Start the health check now so it runs while the page renders
+health_future = api_client.submit_health_check()
+
 # Sidebar navigation
 st.sidebar.title("🌱 Nabt")
 st.sidebar.markdown("---")
 
-# API Health Check in sidebar
+# API Health Check in sidebar, filled in once the page has rendered
 with st.sidebar:
     st.subheader("API Status")
-    health = api_client.health_check()
-    if health["status"] == "success":
-        st.success("✅ Connected")
-    else:
-        st.error("❌ Disconnected")
-        st.caption(f"Error: {health.get('message', 'Unknown error')}")
+    health_placeholder = st.empty()
 
 st.sidebar.markdown("---")
 
@@ -142,4 +140,13 @@ elif page == "⚙️ Process Products":
 
 elif page == "🔍 Product Comparison":
     from pages import product_comparison
-    product_comparison.render(api_client)
\ No newline at end of file
+    product_comparison.render(api_client)
+
+# Show the API health result
+health = health_future.result()
+with health_placeholder.container():
+    if health["status"] == "success":
+        st.success("✅ Connected")
+    else:
+        st.error("❌ Disconnected")
+        st.caption(f"Error: {health.get('message', 'Unknown error')}")
@@ -58,18 +58,16 @@ def render(api_client):
                     st.markdown("### 💰 Price Comparison")
 
                     prices = data["supplier_prices"]
-                    df = pd.DataFrame(prices)
-
-                    # Add unit column
-                    unit_value = data.get("unit", "N/A")
-                    df["unit"] = unit_value
+                    df = pd.DataFrame.from_records(
+                        prices,
+                        columns=["supplier", "price", "currency", "date"]
+                    )
 
-                    # Sort by price
-                    df = df.sort_values("price")
+                    # Add unit column before date: supplier, price, currency, unit, date
+                    df.insert(3, "unit", data.get("unit", "N/A"))
 
-                    # Reorder columns to show: supplier, price, currency, unit, date
-                    column_order = ["supplier", "price", "currency", "unit", "date"]
-                    df = df[column_order]
+                    # Sort by price in place
+                    df.sort_values("price", inplace=True, ignore_index=True)
 
                     # Display as table
                     st.dataframe(
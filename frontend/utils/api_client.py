@@ -1,8 +1,11 @@
 """
 API Client for Nabt Product Extractor API
 """
+import time
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List
 import streamlit as st
 
 
@@ -12,37 +15,88 @@ class APIClient:
     def __init__(self, base_url: str = "http://0.0.0.0:8000"):
         self.base_url = base_url
 
+        # Reuse keep-alive connections across calls instead of reconnecting per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Background worker so non-blocking calls can overlap with page rendering
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
     def health_check(self) -> Dict[str, Any]:
         # Check API health status
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=5)
             response.raise_for_status()
             return {"status": "success", "data": response.json()}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def process_products(self) -> Dict[str, Any]:
-        # Process products for today
+    def submit_health_check(self) -> Future:
+        # Start a health check in the background, returns a Future with the health_check result
+        return self._executor.submit(self.health_check)
+
+    def process_products(self, poll_interval: float = 2.0, timeout: float = 600) -> Dict[str, Any]:
+        # Process products for today: queue a processing job and wait for it to finish
         try:
-            response = requests.post(f"{self.base_url}/api/process", timeout=300)
+            response = self.session.post(f"{self.base_url}/api/process", timeout=30)
             response.raise_for_status()
-            return {"status": "success", "data": response.json()}
+            job_id = response.json()["job_id"]
+
+            deadline = time.monotonic() + timeout
+            while True:
+                job = self._get_processing_job(job_id)
+
+                if job["status"] == "completed":
+                    # Newly processed prices invalidate cached comparisons
+                    _fetch_product_comparison.clear()
+                    return {"status": "success", "data": job["result"]}
+
+                if job["status"] == "failed":
+                    return {"status": "error", "message": job.get("error") or "Processing failed"}
+
+                if time.monotonic() >= deadline:
+                    return {
+                        "status": "error",
+                        "message": f"Processing is still running (job {job_id})"
+                    }
+
+                time.sleep(poll_interval)
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def _get_processing_job(self, job_id: str) -> Dict[str, Any]:
+        # Get the current status of a processing job
+        response = self.session.get(f"{self.base_url}/api/process/{job_id}", timeout=10)
+        response.raise_for_status()
+        return response.json()
+
     def get_product_comparison(
         self,
         product_name: str,
         period: str = "today"
     ) -> Dict[str, Any]:
         # Get price comparison for a specific product
+        try:
+            data = _fetch_product_comparison(self.session, self.base_url, product_name, period)
+            return {"status": "success", "data": data}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def get_product_comparisons(
+        self,
+        product_names: List[str],
+        period: str = "today"
+    ) -> Dict[str, Any]:
+        # Get price comparisons for several products in a single request
         try:
             params = {
-                "product_name": product_name,
+                "product_names": product_names,
                 "period": period
             }
-            response = requests.get(
-                f"{self.base_url}/api/comparison/product",
+            response = self.session.get(
+                f"{self.base_url}/api/comparison/products",
                 params=params,
                 timeout=30
             )
@@ -52,6 +106,28 @@ class APIClient:
             return {"status": "error", "message": str(e)}
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_product_comparison(
+    _session: requests.Session,
+    base_url: str,
+    product_name: str,
+    period: str
+) -> Dict[str, Any]:
+    # Fetch a product comparison, cached across Streamlit reruns (errors are not cached);
+    # the leading underscore keeps the session out of the cache key
+    params = {
+        "product_name": product_name,
+        "period": period
+    }
+    response = _session.get(
+        f"{base_url}/api/comparison/product",
+        params=params,
+        timeout=30
+    )
+    response.raise_for_status()
+    return response.json()
+
+
 @st.cache_resource
 def get_api_client(base_url: str = "http://localhost:8000") -> APIClient:
     # Get cached API client instance
@@ -0,0 +1,105 @@
+"""
+Tests for the in-process TTL cache.
+"""
+
+import pytest
+
+from backend.core import cache as cache_module
+from backend.core.cache import MISSING, TTLCache
+
+
+class FakeClock:
+    # Stand-in for the time module with a manually advanced monotonic clock
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+def test_get_returns_stored_value(clock):
+    cache = TTLCache()
+    cache.set("key", "value", ttl=10)
+
+    assert cache.get("key") == "value"
+
+
+def test_get_returns_default_for_missing_key(clock):
+    cache = TTLCache()
+
+    assert cache.get("missing") is None
+    assert cache.get("missing", MISSING) is MISSING
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache()
+    cache.set("key", "value", ttl=10)
+
+    clock.now += 9.9
+    assert cache.get("key") == "value"
+
+    clock.now += 0.1
+    assert cache.get("key", MISSING) is MISSING
+    assert len(cache) == 0
+
+
+def test_entries_expire_independently(clock):
+    cache = TTLCache()
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=60)
+
+    clock.now += 30
+    assert cache.get("short", MISSING) is MISSING
+    assert cache.get("long") == 2
+
+
+def test_set_overwrites_value_and_ttl(clock):
+    cache = TTLCache()
+    cache.set("key", "old", ttl=5)
+    cache.set("key", "new", ttl=60)
+
+    clock.now += 30
+    assert cache.get("key") == "new"
+    assert len(cache) == 1
+
+
+def test_evicts_least_recently_used_when_full(clock):
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    cache.set("c", 3, ttl=60)
+
+    assert len(cache) == 2
+    assert cache.get("b", MISSING) is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cached_none_is_distinguished_from_miss(clock):
+    cache = TTLCache()
+    cache.set("not_found", None, ttl=60)
+
+    assert cache.get("not_found", MISSING) is None
+    assert cache.get("other", MISSING) is MISSING
+
+
+def test_clear_removes_all_entries(clock):
+    cache = TTLCache()
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get("a", MISSING) is MISSING
@@ -0,0 +1,117 @@
+"""
+Tests for processing job tracking.
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from backend.services.job_service import JobService, JobStatus
+
+
+def test_create_job_is_queued():
+    service = JobService()
+    job = service.create_job()
+
+    assert job.status is JobStatus.QUEUED
+    assert job.finished_at is None
+    assert service.get_job(job.job_id) is job
+
+
+def test_job_runs_to_completion():
+    service = JobService()
+    job = service.create_job()
+
+    service.mark_running(job.job_id)
+    assert service.get_job(job.job_id).status is JobStatus.RUNNING
+
+    result = {"status": "success", "processed": 3}
+    service.mark_completed(job.job_id, result)
+
+    job = service.get_job(job.job_id)
+    assert job.status is JobStatus.COMPLETED
+    assert job.result == result
+    assert job.error is None
+    assert job.finished_at is not None
+
+
+def test_job_runs_to_failure():
+    service = JobService()
+    job = service.create_job()
+
+    service.mark_running(job.job_id)
+    service.mark_failed(job.job_id, "File not found: data.json")
+
+    job = service.get_job(job.job_id)
+    assert job.status is JobStatus.FAILED
+    assert job.error == "File not found: data.json"
+    assert job.result is None
+    assert job.finished_at is not None
+
+
+def test_unknown_job_returns_none():
+    service = JobService()
+
+    assert service.get_job("unknown") is None
+
+
+def test_updating_unknown_job_is_ignored():
+    service = JobService()
+
+    service.mark_running("unknown")
+    service.mark_completed("unknown", {})
+
+    assert service.get_job("unknown") is None
+
+
+def test_oldest_job_is_evicted_past_max_jobs(monkeypatch):
+    monkeypatch.setattr(JobService, "MAX_JOBS", 3)
+    service = JobService()
+    jobs = [service.create_job() for _ in range(4)]
+
+    assert service.get_job(jobs[0].job_id) is None
+    for job in jobs[1:]:
+        assert service.get_job(job.job_id) is job
+
+
+def test_processing_job_fails_when_pipeline_cannot_be_imported(monkeypatch):
+    routes = pytest.importorskip("backend.api.routes")
+    service = JobService()
+    monkeypatch.setattr(routes, "get_job_service", lambda: service)
+    # A None entry makes the lazy import raise ImportError
+    monkeypatch.setitem(sys.modules, "backend.services.product_service", None)
+    job = service.create_job()
+
+    asyncio.run(routes._run_processing_job(job.job_id, "key", "data"))
+
+    job = service.get_job(job.job_id)
+    assert job.status is JobStatus.FAILED
+    assert job.finished_at is not None
+
+
+def test_process_status_returns_job(monkeypatch):
+    routes = pytest.importorskip("backend.api.routes")
+    service = JobService()
+    monkeypatch.setattr(routes, "get_job_service", lambda: service)
+    job = service.create_job()
+    service.mark_running(job.job_id)
+    service.mark_failed(job.job_id, "Validation error: bad data")
+
+    response = asyncio.run(routes.get_process_status(job.job_id))
+
+    assert response.job_id == job.job_id
+    assert response.status == JobStatus.FAILED.value
+    assert response.error == "Validation error: bad data"
+
+
+def test_process_status_unknown_job_is_404(monkeypatch):
+    routes = pytest.importorskip("backend.api.routes")
+    from fastapi import HTTPException
+
+    monkeypatch.setattr(routes, "get_job_service", lambda: JobService())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(routes.get_process_status("unknown"))
+
+    assert exc_info.value.status_code == 404
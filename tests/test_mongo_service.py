@@ -0,0 +1,90 @@
+"""
+Tests for storing products in MongoDB.
+"""
+
+from types import SimpleNamespace
+from typing import Optional
+
+from backend.database.mongo_service import MongoDBService
+from backend.models.product import Product
+
+
+class StubCollection:
+    # Records bulk writes instead of sending them to a server
+
+    def __init__(self):
+        self.requests = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.requests.extend(requests)
+        return SimpleNamespace(upserted_count=len(requests), modified_count=0)
+
+
+def make_service() -> MongoDBService:
+    # Build a service around a stub collection, skipping the connection in __init__
+    service = MongoDBService.__new__(MongoDBService)
+    service.collection = StubCollection()
+    return service
+
+
+def make_product(original_name: str, price: float, origin: Optional[str] = None, source: str = "s1") -> Product:
+    return Product(
+        Original_name=original_name,
+        ProductName="Tomato",
+        Unit="1kg",
+        Origin=origin,
+        Price=price,
+        Currency="SAR",
+        Source=source
+    )
+
+
+def stored_docs(service: MongoDBService) -> list:
+    # Documents sent as ReplaceOne replacements
+    return [request._doc for request in service.collection.requests]
+
+
+def test_insert_keeps_origins_of_the_same_product():
+    service = make_service()
+
+    result = service.insert_products([
+        make_product("Tomato Jordan 1kg", 4.0, origin="Jordan"),
+        make_product("Tomato Egypt 1kg", 3.0, origin="Egypt"),
+    ])
+
+    assert result["inserted_count"] == 2
+    assert sorted(doc["origin"] for doc in stored_docs(service)) == ["Egypt", "Jordan"]
+
+
+def test_insert_replaces_on_date_original_name_and_source():
+    service = make_service()
+
+    service.insert_products([make_product("Tomato Jordan 1kg", 4.0, origin="Jordan")])
+
+    (request,) = service.collection.requests
+    assert set(request._filter) == {"date", "original_name", "source"}
+    assert request._filter["original_name"] == "Tomato Jordan 1kg"
+
+
+def test_insert_keeps_same_product_from_different_sources():
+    service = make_service()
+
+    service.insert_products([
+        make_product("Tomato 1kg", 4.0, source="s1"),
+        make_product("Tomato 1kg", 3.0, source="s2"),
+    ])
+
+    assert len(stored_docs(service)) == 2
+
+
+def test_insert_keeps_last_repeat_within_batch():
+    service = make_service()
+
+    service.insert_products([
+        make_product("Tomato 1kg", 4.0),
+        make_product("Tomato 1kg", 3.5),
+    ])
+
+    docs = stored_docs(service)
+    assert len(docs) == 1
+    assert docs[0]["price"] == 3.5